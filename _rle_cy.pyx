@@ -0,0 +1,97 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Cython RLE kernels for advanced_data_to_video.py
+Optional alternative to the Numba kernels, build in place with:
+
+    cythonize -i _rle_cy.pyx
+
+All functions write into a caller-provided buffer and return the number of
+bytes written, using the same escape format as the Python implementation:
+runs of 4+ equal bytes become [255, value, count].
+"""
+
+
+cdef inline Py_ssize_t _emit(unsigned char[::1] dst, Py_ssize_t pos,
+                             unsigned char value, Py_ssize_t count) noexcept nogil:
+    cdef Py_ssize_t k
+    if count > 3:
+        dst[pos] = 255
+        dst[pos + 1] = value
+        dst[pos + 2] = <unsigned char>count
+        return pos + 3
+    for k in range(count):
+        dst[pos + k] = value
+    return pos + count
+
+
+def encode(const unsigned char[::1] src, unsigned char[::1] dst):
+    """RLE encode src into dst (at least len(src) bytes)."""
+    cdef Py_ssize_t n = src.shape[0]
+    cdef Py_ssize_t pos = 0, i = 0, count
+    cdef unsigned char value
+    with nogil:
+        while i < n:
+            value = src[i]
+            count = 1
+            while i + count < n and src[i + count] == value and count < 255:
+                count += 1
+            pos = _emit(dst, pos, value, count)
+            i += count
+    return pos
+
+
+def encode_frame(const unsigned char[::1] src, unsigned char[::1] dst):
+    """Differential + RLE encode src into dst (at least len(src) bytes, zeroed)."""
+    cdef Py_ssize_t n = src.shape[0]
+    cdef Py_ssize_t pos = 0, i = 0, count
+    cdef unsigned char value
+    if n == 1:
+        # A single byte is stored as-is, like create_compression_matrix does
+        dst[0] = src[0]
+        return 1
+    with nogil:
+        while i < n:
+            # Differential of byte i (the first byte has no predecessor)
+            value = <unsigned char>(src[i] - src[i - 1]) if i > 0 else 0
+            count = 1
+            while (i + count < n and count < 255
+                   and <unsigned char>(src[i + count] - src[i + count - 1]) == value):
+                count += 1
+            pos = _emit(dst, pos, value, count)
+            i += count
+    return pos
+
+
+def decoded_size(const unsigned char[::1] src):
+    """Number of bytes decode() will write for src."""
+    cdef Py_ssize_t n = src.shape[0]
+    cdef Py_ssize_t size = 0, i = 0
+    with nogil:
+        while i < n:
+            if src[i] == 255 and i + 2 < n:
+                size += src[i + 2]
+                i += 3
+            else:
+                size += 1
+                i += 1
+    return size
+
+
+def decode(const unsigned char[::1] src, unsigned char[::1] dst):
+    """RLE decode src into dst (at least decoded_size(src) bytes)."""
+    cdef Py_ssize_t n = src.shape[0]
+    cdef Py_ssize_t pos = 0, i = 0, k
+    cdef unsigned char value
+    with nogil:
+        while i < n:
+            if src[i] == 255 and i + 2 < n:
+                value = src[i + 1]
+                for k in range(src[i + 2]):
+                    dst[pos + k] = value
+                pos += src[i + 2]
+                i += 3
+            else:
+                dst[pos] = src[i]
+                pos += 1
+                i += 1
+    return pos
@@ -7,16 +7,231 @@ Uses matrix transformations for compression and encoding matrix in audio.
 
 import os
 import math
+import mmap
 import numpy as np
 from PIL import Image
 import argparse
 from pathlib import Path
 import json
 import struct
+import multiprocessing
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from data_to_video import VIDEO_CODEC_ARGS
+
+try:
+    import numba
+except ImportError:  # Numba is optional, the NumPy implementations are used instead
+    numba = None
+
+try:
+    import _rle_cy  # Optional Cython kernels, build with: cythonize -i _rle_cy.pyx
+except ImportError:
+    _rle_cy = None
+
+
+def _rle_encode_kernel(data):
+    """Scalar RLE encoder, compiled with Numba when it is available."""
+    n = len(data)
+    # RLE never grows the data: literal runs are copied, escapes are shorter
+    out = np.empty(n, dtype=np.uint8)
+    pos = 0
+    i = 0
+    while i < n:
+        value = data[i]
+        count = 1
+        while i + count < n and data[i + count] == value and count < 255:
+            count += 1
+        
+        if count > 3:
+            out[pos] = 255
+            out[pos + 1] = value
+            out[pos + 2] = count
+            pos += 3
+        else:
+            for k in range(count):
+                out[pos + k] = value
+            pos += count
+        
+        i += count
+    
+    return out[:pos]
+
+
+def _rle_decode_kernel(data):
+    """Scalar RLE decoder, compiled with Numba when it is available."""
+    n = len(data)
+    
+    # First pass sizes the output, second pass fills it
+    size = 0
+    i = 0
+    while i < n:
+        if data[i] == 255 and i + 2 < n:
+            size += data[i + 2]
+            i += 3
+        else:
+            size += 1
+            i += 1
+    
+    out = np.empty(size, dtype=np.uint8)
+    pos = 0
+    i = 0
+    while i < n:
+        if data[i] == 255 and i + 2 < n:
+            value = data[i + 1]
+            for k in range(data[i + 2]):
+                out[pos + k] = value
+            pos += data[i + 2]
+            i += 3
+        else:
+            out[pos] = data[i]
+            pos += 1
+            i += 1
+    
+    return out
+
+
+def _encode_frame_kernel(data, out):
+    """
+    Fused differential + RLE encoder, compiled with Numba when it is available.
+    Writes the compressed stream into out (at least len(data) bytes, already
+    zeroed) and returns the number of bytes used.
+    """
+    n = len(data)
+    if n == 1:
+        # A single byte is stored as-is, like create_compression_matrix does
+        out[0] = data[0]
+        return 1
+    
+    pos = 0
+    i = 0
+    while i < n:
+        # Differential of byte i (the first byte has no predecessor)
+        value = (np.int64(data[i]) - np.int64(data[i - 1])) & 0xFF if i > 0 else 0
+        count = 1
+        while i + count < n and count < 255:
+            k = i + count
+            if (np.int64(data[k]) - np.int64(data[k - 1])) & 0xFF != value:
+                break
+            count += 1
+        
+        if count > 3:
+            out[pos] = 255
+            out[pos + 1] = value
+            out[pos + 2] = count
+            pos += 3
+        else:
+            for k in range(count):
+                out[pos + k] = value
+            pos += count
+        
+        i += count
+    
+    return pos
+
+
+# Fixed-size per-frame record stored in metadata.bin (the frame index is the
+# record's position)
+FRAME_METADATA_DTYPE = np.dtype([
+    ('video_bytes', '<u4'),
+    ('audio_bytes', '<u4'),
+    ('original_length', '<u4'),
+    ('compressed_length', '<u4'),
+    ('matrix_size', '<u2'),
+    ('differential_base', 'u1'),
+    ('_pad', 'u1'),
+])
+
+# Frame compression modes: 'none' stores frame bytes as-is, 'rle' applies
+# differential + RLE (lossy for data containing 255 bytes)
+COMPRESSION_MODES = ('none', 'rle')
+
+
+# Converter and reusable frame buffer of a frame worker process, set once per
+# process by the pool
+_worker_converter = None
+_worker_frame_buffer = None
+_worker_frame_used = 0
+
+
+def _init_frame_worker(converter):
+    """Pool initializer: keep the converter and a frame buffer around for _process_frame."""
+    global _worker_converter, _worker_frame_buffer
+    _worker_converter = converter
+    _worker_frame_buffer = np.zeros(converter.bytes_per_frame_video, dtype=np.uint8)
+
+
+def _process_frame(args):
+    """
+    Compress and save one video frame in a worker process.
+    
+    Args:
+        args: Tuple of (frame_idx, input_file, output_dir, frame_format)
+        
+    Returns:
+        Tuple of (frame_idx, compression_metadata)
+    """
+    global _worker_frame_used
+    frame_idx, input_file, output_dir, frame_format = args
+    converter = _worker_converter
+    compressed_video = _worker_frame_buffer
+    
+    # The video payload is at the start of the frame's slice, so reading at
+    # most one frame of video never runs into the next frame's data
+    with open(input_file, 'rb') as f:
+        f.seek(frame_idx * converter.bytes_per_frame_total)
+        video_data = f.read(converter.bytes_per_frame_video)
+    
+    # Clear whatever a longer previous frame left after the new data
+    compression_meta = converter._compress_into(video_data, compressed_video)
+    compressed_video[compression_meta['compressed_length']:_worker_frame_used] = 0
+    _worker_frame_used = compression_meta['compressed_length']
+    
+    if frame_format == 'raw':
+        with open(os.path.join(output_dir, 'frames.bin'), 'r+b') as f:
+            f.seek(frame_idx * converter.bytes_per_frame_video)
+            f.write(compressed_video)
+    else:
+        frame_array = compressed_video.reshape((converter.height, converter.width, 3))
+        frame_filename = os.path.join(output_dir, f'frame_{frame_idx:06d}.png')
+        Image.fromarray(frame_array, mode='RGB').save(frame_filename, compress_level=1)
+    
+    return frame_idx, compression_meta
+
+
+def _load_png_frame(frame_filename):
+    """Decode one PNG frame to a flat array of its RGB bytes."""
+    with Image.open(frame_filename) as img:
+        return np.asarray(img).reshape(-1)
+
+
+# Compiled kernels: Numba if available, else the Cython build, else None (the
+# converter then uses its NumPy implementations)
+if numba is not None:
+    _rle_encode_fast = numba.njit(cache=True, boundscheck=False)(_rle_encode_kernel)
+    _rle_decode_fast = numba.njit(cache=True, boundscheck=False)(_rle_decode_kernel)
+    _encode_frame_fast = numba.njit(cache=True, boundscheck=False)(_encode_frame_kernel)
+elif _rle_cy is not None:
+    def _rle_encode_fast(data):
+        out = np.empty(len(data), dtype=np.uint8)
+        return out[:_rle_cy.encode(data, out)]
+    
+    def _rle_decode_fast(data):
+        out = np.empty(_rle_cy.decoded_size(data), dtype=np.uint8)
+        _rle_cy.decode(data, out)
+        return out
+    
+    _encode_frame_fast = _rle_cy.encode_frame
+else:
+    _rle_encode_fast = None
+    _rle_decode_fast = None
+    _encode_frame_fast = None
 
 
 class AdvancedDataToVideoConverter:
-    def __init__(self, width=1920, height=1080, sample_rate=48000, audio_channels=2):
+    def __init__(self, width=1920, height=1080, sample_rate=48000, audio_channels=2, matrix_size=16,
+                 compression='none'):
         """
         Initialize converter with frame dimensions and audio parameters.
         
@@ -25,11 +240,18 @@ class AdvancedDataToVideoConverter:
             height: Frame height in pixels (default: 1080)
             sample_rate: Audio sample rate in Hz (default: 48000)
             audio_channels: Number of audio channels (1=mono, 2=stereo)
+            matrix_size: Size of the DCT transformation matrix (default: 16)
+            compression: 'none' to store frame bytes as-is and leave compression
+                to the video codec, or 'rle' for differential + RLE (default: 'none')
         """
         self.width = width
         self.height = height
         self.sample_rate = sample_rate
         self.audio_channels = audio_channels
+        self.matrix_size = matrix_size
+        if compression not in COMPRESSION_MODES:
+            raise ValueError(f"Unsupported compression {compression!r} (expected one of {COMPRESSION_MODES})")
+        self.compression = compression
         
         # Video capacity
         self.pixels_per_frame = width * height
@@ -39,9 +261,29 @@ class AdvancedDataToVideoConverter:
         self.samples_per_frame = sample_rate // 30  # ~1600 samples per frame at 48kHz
         self.bytes_per_frame_audio = self.samples_per_frame * audio_channels * 2  # 16-bit samples
         
+        # The DCT matrix only depends on matrix_size, so build it (and its
+        # audio encoding) once instead of per frame
+        self._dct_matrix = self._build_dct_matrix(matrix_size)
+        self._matrix_audio_bytes = self.matrix_to_audio(self._dct_matrix)
+        
+        # The matrix is stored at the start of every frame's audio, the rest
+        # of the audio carries data
+        self.bytes_per_frame_matrix = min(len(self._matrix_audio_bytes), self.bytes_per_frame_audio)
+        self.bytes_per_frame_audio_payload = self.bytes_per_frame_audio - self.bytes_per_frame_matrix
+        
         # Total capacity per frame
-        self.bytes_per_frame_total = self.bytes_per_frame_video + self.bytes_per_frame_audio
+        self.bytes_per_frame_total = self.bytes_per_frame_video + self.bytes_per_frame_audio_payload
         
+    @staticmethod
+    def _build_dct_matrix(matrix_size):
+        """Build the normalized DCT-like transformation matrix."""
+        i = np.arange(matrix_size)
+        j = np.arange(matrix_size)
+        matrix = np.cos(np.pi * (2 * i[:, None] + 1) * j[None, :] / (2 * matrix_size))
+        
+        # Normalize matrix
+        return (matrix / np.linalg.norm(matrix)).astype(np.float32)
+    
     def create_compression_matrix(self, data_chunk, matrix_size=16):
         """
         Create a transformation matrix for data compression/encoding.
@@ -62,20 +304,12 @@ class AdvancedDataToVideoConverter:
         else:
             differential = data_array
         
-        # Create transformation matrix based on data patterns
-        # This matrix will be stored in audio and used for decoding
-        matrix = np.zeros((matrix_size, matrix_size), dtype=np.float32)
-        
-        # Analyze data patterns to create optimal matrix
-        data_reshaped = differential[:matrix_size * matrix_size].reshape(matrix_size, matrix_size) if len(differential) >= matrix_size * matrix_size else np.pad(differential, (0, matrix_size * matrix_size - len(differential))).reshape(matrix_size, matrix_size)
-        
-        # Use DCT-like transformation for compression
-        for i in range(matrix_size):
-            for j in range(matrix_size):
-                matrix[i, j] = np.cos((2 * i + 1) * j * np.pi / (2 * matrix_size))
-        
-        # Normalize matrix
-        matrix = matrix / np.linalg.norm(matrix)
+        # Transformation matrix, stored in audio and used for decoding.
+        # Use DCT-like transformation for compression (cached for the default size)
+        if matrix_size == self.matrix_size:
+            matrix = self._dct_matrix
+        else:
+            matrix = self._build_dct_matrix(matrix_size)
         
         # Apply RLE (Run-Length Encoding) for repeated patterns
         compressed = self._apply_rle(differential)
@@ -90,50 +324,143 @@ class AdvancedDataToVideoConverter:
         
         return compressed, matrix, metadata
     
+    def _compress_into(self, video_data, out):
+        """
+        Differential + RLE encode video_data directly into the frame buffer.
+        
+        Args:
+            video_data: Frame payload bytes
+            out: uint8 buffer of at least len(video_data) bytes; bytes past
+                the compressed data are left untouched
+            
+        Returns:
+            Compression metadata (same keys as create_compression_matrix)
+        """
+        data_array = np.frombuffer(video_data, dtype=np.uint8)
+        
+        # Passthrough: the payload goes into the frame untouched
+        if self.compression == 'none':
+            out[:len(data_array)] = data_array
+            return {
+                'original_length': len(data_array),
+                'compressed_length': len(data_array),
+                'compression_ratio': 1.0,
+                'matrix_size': self.matrix_size,
+                'differential_base': 0
+            }
+        
+        if _encode_frame_fast is not None:
+            compressed_length = _encode_frame_fast(data_array, out)
+            return {
+                'original_length': len(data_array),
+                'compressed_length': compressed_length,
+                'compression_ratio': compressed_length / len(data_array) if len(data_array) > 0 else 1.0,
+                'matrix_size': self.matrix_size,
+                'differential_base': int(data_array[0]) if len(data_array) > 0 else 0
+            }
+        
+        compressed, _, metadata = self.create_compression_matrix(video_data, self.matrix_size)
+        out[:len(compressed)] = compressed
+        return metadata
+    
+    @staticmethod
+    def _store_compression_meta(frames_metadata, frame_idx, compression_meta):
+        """Copy a compression metadata dict into a frame's metadata record."""
+        for field in ('original_length', 'compressed_length', 'matrix_size', 'differential_base'):
+            frames_metadata[field][frame_idx] = compression_meta[field]
+    
+    def load_frame_metadata(self, frames_dir):
+        """
+        Load the per-frame metadata records written next to metadata.json.
+        
+        Args:
+            frames_dir: Directory containing frames and audio
+            
+        Returns:
+            Structured array with one FRAME_METADATA_DTYPE record per frame
+        """
+        return np.fromfile(os.path.join(frames_dir, 'metadata.bin'), dtype=FRAME_METADATA_DTYPE)
+    
     def _apply_rle(self, data):
         """Apply Run-Length Encoding to compress repeated patterns."""
         if len(data) == 0:
             return data
         
-        compressed = []
-        i = 0
-        while i < len(data):
-            count = 1
-            while i + count < len(data) and data[i] == data[i + count] and count < 255:
-                count += 1
-            
-            if count > 3:  # Only encode if we have 4+ repeated values
-                compressed.extend([255, data[i], count])  # Escape sequence
-            else:
-                compressed.extend([data[i]] * count)
-            
-            i += count
-        
-        return np.array(compressed, dtype=np.uint8)
+        data = np.asarray(data, dtype=np.uint8)
+        if _rle_encode_fast is not None:
+            return _rle_encode_fast(data)
+        
+        n = len(data)
+        
+        # Find the end index, length and value of every run of equal bytes
+        run_ends = np.append(np.nonzero(data[1:] != data[:-1])[0], n - 1)
+        run_lengths = np.diff(np.append(-1, run_ends))
+        run_values = data[run_ends]
+        
+        # Split runs into chunks of at most 255 (the count must fit in a byte)
+        full_chunks, remainder = np.divmod(run_lengths, 255)
+        chunks_per_run = full_chunks + (remainder > 0)
+        chunk_values = np.repeat(run_values, chunks_per_run)
+        chunk_lengths = np.full(len(chunk_values), 255, dtype=np.int64)
+        last_chunk = np.cumsum(chunks_per_run) - 1
+        has_remainder = remainder > 0
+        chunk_lengths[last_chunk[has_remainder]] = remainder[has_remainder]
+        
+        # Only encode if we have 4+ repeated values, as [255, value, count]
+        escaped = chunk_lengths > 3
+        output_lengths = np.where(escaped, 3, chunk_lengths)
+        
+        # Literal chunks are just their value repeated; escaped chunks get the
+        # value in the middle slot, then the marker and count are filled in
+        compressed = np.repeat(chunk_values, output_lengths)
+        escape_starts = (np.cumsum(output_lengths) - output_lengths)[escaped]
+        compressed[escape_starts] = 255
+        compressed[escape_starts + 2] = chunk_lengths[escaped]
+        
+        return compressed
     
     def _decode_rle(self, data):
         """Decode Run-Length Encoded data."""
         if len(data) == 0:
             return data
         
-        decompressed = []
-        i = 0
-        while i < len(data):
-            if data[i] == 255 and i + 2 < len(data):  # Escape sequence
-                value = data[i + 1]
-                count = data[i + 2]
-                decompressed.extend([value] * count)
-                i += 3
-            else:
-                decompressed.append(data[i])
-                i += 1
-        
-        return np.array(decompressed, dtype=np.uint8)
+        data = np.asarray(data, dtype=np.uint8)
+        if _rle_decode_fast is not None:
+            return _rle_decode_fast(data)
+        
+        n = len(data)
+        
+        # Whether a 255 starts an escape sequence depends on the bytes before
+        # it (it may be the value or count of a previous escape), so walk only
+        # the 255 candidates to find the real escape starts
+        escape_starts = []
+        next_free = 0
+        for pos in np.flatnonzero(data[:n - 2] == 255).tolist():
+            if pos >= next_free:
+                escape_starts.append(pos)
+                next_free = pos + 3
+        escape_starts = np.array(escape_starts, dtype=np.int64)
+        
+        # Every byte that is not the value/count of an escape starts a token
+        is_token = np.ones(n, dtype=bool)
+        is_token[escape_starts + 1] = False
+        is_token[escape_starts + 2] = False
+        token_starts = np.flatnonzero(is_token)
+        
+        # Literal tokens emit one byte, escape tokens emit value * count
+        values = data[token_starts]
+        counts = np.ones(len(token_starts), dtype=np.int64)
+        escape_tokens = np.searchsorted(token_starts, escape_starts)
+        values[escape_tokens] = data[escape_starts + 1]
+        counts[escape_tokens] = data[escape_starts + 2]
+        
+        return np.repeat(values, counts)
     
     def matrix_to_audio(self, matrix):
         """
         Convert transformation matrix to audio samples.
-        Each matrix element becomes a 16-bit audio sample.
+        Each matrix element is quantized to 8 bits (two per 16-bit audio
+        sample); the matrix only has to be recognisable, not exact.
         
         Args:
             matrix: 2D numpy array
@@ -141,16 +468,16 @@ class AdvancedDataToVideoConverter:
         Returns:
             Audio samples as bytes
         """
-        # Flatten matrix and normalize to 16-bit range
+        # Flatten matrix and normalize to 8-bit range
         flat_matrix = matrix.flatten()
         
-        # Normalize to [-32768, 32767] range for 16-bit audio
+        # Normalize to [-128, 127] range
         min_val, max_val = flat_matrix.min(), flat_matrix.max()
         if max_val - min_val > 0:
             normalized = (flat_matrix - min_val) / (max_val - min_val)
-            audio_samples = (normalized * 65535 - 32768).astype(np.int16)
+            audio_samples = np.round(normalized * 255 - 128).astype(np.int8)
         else:
-            audio_samples = np.zeros(len(flat_matrix), dtype=np.int16)
+            audio_samples = np.zeros(len(flat_matrix), dtype=np.int8)
         
         return audio_samples.tobytes()
     
@@ -159,17 +486,17 @@ class AdvancedDataToVideoConverter:
         Convert audio samples back to transformation matrix.
         
         Args:
-            audio_bytes: Audio data as bytes
+            audio_bytes: Audio data as bytes, or a uint8/int8 array
             matrix_size: Size of the matrix
             
         Returns:
             2D numpy array matrix
         """
-        # Convert bytes to int16 samples
-        samples = np.frombuffer(audio_bytes, dtype=np.int16)
+        # View the buffer as 8-bit values (no copy for bytes or arrays)
+        samples = np.frombuffer(audio_bytes, dtype=np.int8)
         
-        # Denormalize from [-32768, 32767] back to original range
-        normalized = (samples.astype(np.float32) + 32768) / 65535
+        # Denormalize from [-128, 127] back to original range
+        normalized = (samples.astype(np.float32) + 128) / 255
         
         # Reshape to matrix
         matrix = normalized[:matrix_size * matrix_size].reshape(matrix_size, matrix_size)
@@ -191,20 +518,16 @@ class AdvancedDataToVideoConverter:
         data_array = np.frombuffer(data_chunk, dtype=np.uint8).astype(np.float32)
         matrix_size = matrix.shape[0]
         
-        # Apply matrix transformation in blocks
-        encoded = []
-        for i in range(0, len(data_array), matrix_size):
-            block = data_array[i:i + matrix_size]
-            if len(block) < matrix_size:
-                block = np.pad(block, (0, matrix_size - len(block)))
-            
-            # Apply matrix multiplication
-            transformed = np.dot(matrix[0], block)
-            encoded.append(transformed % 256)  # Keep in byte range
+        # Zero-pad the last block, then transform all blocks in one matmul
+        pad = -len(data_array) % matrix_size
+        if pad:
+            data_array = np.pad(data_array, (0, pad))
+        blocks = data_array.reshape(-1, matrix_size)
+        transformed = blocks @ matrix[0]
         
-        return np.array(encoded, dtype=np.uint8)
+        return np.mod(transformed, 256).astype(np.uint8)  # Keep in byte range
     
-    def file_to_frames_with_audio(self, input_file, output_dir, fps=30):
+    def file_to_frames_with_audio(self, input_file, output_dir, fps=30, frame_format='png', workers=1):
         """
         Convert a file to video frames + audio, with matrix encoding.
         
@@ -212,15 +535,21 @@ class AdvancedDataToVideoConverter:
             input_file: Path to input file
             output_dir: Directory to save frames and audio
             fps: Frames per second (default: 30)
+            frame_format: 'png' for one PNG per frame, or 'raw' to write all
+                frames as rgb24 into a single frames.bin (no PNG encode/decode)
+            workers: Number of processes compressing and saving frames
+                (default: 1, encode in this process)
         """
-        # Read file data
+        # Map the file instead of reading it, so only the pages of the frame
+        # being encoded need to be resident
         with open(input_file, 'rb') as f:
-            data = f.read()
+            file_size = os.fstat(f.fileno()).st_size
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if file_size > 0 else b''
         
-        file_size = len(data)
         print(f"File size: {file_size:,} bytes")
         print(f"Video capacity per frame: {self.bytes_per_frame_video:,} bytes")
-        print(f"Audio capacity per frame: {self.bytes_per_frame_audio:,} bytes")
+        print(f"Audio capacity per frame: {self.bytes_per_frame_audio_payload:,} bytes "
+              f"(+{self.bytes_per_frame_matrix:,} bytes matrix)")
         print(f"Total capacity per frame: {self.bytes_per_frame_total:,} bytes")
         
         # Calculate number of frames needed
@@ -230,74 +559,111 @@ class AdvancedDataToVideoConverter:
         # Create output directory
         os.makedirs(output_dir, exist_ok=True)
         
-        # Initialize audio buffer
-        all_audio_data = []
+        # Initialize audio buffer: one row of samples per frame, each starting
+        # with the matrix samples (this is the encoding key, identical for
+        # every frame) followed by the zero-padded payload
+        audio_buf = np.zeros((num_frames, self.samples_per_frame * self.audio_channels), dtype=np.int16)
+        audio_buf_bytes = audio_buf.view(np.uint8)
+        matrix_len = self.bytes_per_frame_matrix
+        audio_buf_bytes[:, :matrix_len] = np.frombuffer(self._matrix_audio_bytes, dtype=np.uint8)[:matrix_len]
         
-        # Store all frame metadata
-        frames_metadata = []
+        # Store all frame metadata as fixed-size records
+        frames_metadata = np.zeros(num_frames, dtype=FRAME_METADATA_DTYPE)
         
         print(f"\nGenerating frames with audio encoding...")
         
+        # Raw frames are stored back to back in a single rgb24 file. Worker
+        # processes write at their frame's offset, so it is sized up front.
+        raw_frames = None
+        if frame_format == 'raw':
+            raw_frames = open(os.path.join(output_dir, 'frames.bin'), 'wb')
+            if workers > 1:
+                raw_frames.truncate(num_frames * self.bytes_per_frame_video)
+                raw_frames.close()
+                raw_frames = None
+        
+        # PNG compression releases the GIL, so saves run on a thread pool and
+        # overlap with encoding the next frame. The number of pending saves is
+        # bounded so frames don't pile up in memory.
+        save_workers = os.cpu_count() or 1
+        save_executor = ThreadPoolExecutor(max_workers=save_workers)
+        pending_saves = deque()
+        
+        # One frame buffer reused for every frame. Image.fromarray copies RGB
+        # data, so pending PNG saves never see it change.
+        frame_buffer = np.zeros(self.bytes_per_frame_video, dtype=np.uint8)
+        frame_used = 0
+        
         for frame_idx in range(num_frames):
             # Calculate data slice for this frame
             start_idx = frame_idx * self.bytes_per_frame_total
             end_idx = min(start_idx + self.bytes_per_frame_total, file_size)
-            frame_total_data = data[start_idx:end_idx]
+            frame_total_data = np.frombuffer(data, dtype=np.uint8, count=end_idx - start_idx, offset=start_idx)
             
             # Split data between video and audio
             video_data_size = min(len(frame_total_data), self.bytes_per_frame_video)
             video_data = frame_total_data[:video_data_size]
-            audio_data = frame_total_data[video_data_size:] if len(frame_total_data) > video_data_size else b''
-            
-            # Create compression matrix for this frame's data
-            compressed_video, encoding_matrix, compression_meta = self.create_compression_matrix(video_data)
-            
-            # Pad compressed video data if needed
-            if len(compressed_video) < self.bytes_per_frame_video:
-                compressed_video = np.pad(compressed_video, (0, self.bytes_per_frame_video - len(compressed_video)))
-            else:
-                compressed_video = compressed_video[:self.bytes_per_frame_video]
+            audio_data = frame_total_data[video_data_size:]
             
-            # Convert matrix to audio samples (this is the encoding key)
-            matrix_audio = self.matrix_to_audio(encoding_matrix)
+            # Write the payload after the matrix samples in this frame's row
+            audio_buf_bytes[frame_idx, matrix_len:matrix_len + len(audio_data)] = audio_data
             
-            # Combine actual data audio + matrix audio
-            audio_data_padded = audio_data + b'\x00' * (self.bytes_per_frame_audio - len(matrix_audio) - len(audio_data))
-            full_audio = matrix_audio + audio_data_padded
+            # Store frame metadata
+            frames_metadata['video_bytes'][frame_idx] = video_data_size
+            frames_metadata['audio_bytes'][frame_idx] = len(audio_data)
             
-            # Convert audio bytes to 16-bit samples
-            audio_samples = np.frombuffer(full_audio[:self.bytes_per_frame_audio], dtype=np.int16)
+            if workers > 1:
+                continue  # Video is compressed by the worker pool below
             
-            # Store for later (will create actual audio file)
-            all_audio_data.append(audio_samples)
+            # Compress this frame's data straight into the frame buffer, then
+            # clear whatever a longer previous frame left after the new data
+            compression_meta = self._compress_into(video_data, frame_buffer)
+            frame_buffer[compression_meta['compressed_length']:frame_used] = 0
+            frame_used = compression_meta['compressed_length']
+            self._store_compression_meta(frames_metadata, frame_idx, compression_meta)
             
             # Create video frame from compressed data
-            pixels = np.frombuffer(compressed_video, dtype=np.uint8)
-            frame_array = pixels.reshape((self.height, self.width, 3))
-            
-            # Create image
-            img = Image.fromarray(frame_array, mode='RGB')
-            frame_filename = os.path.join(output_dir, f'frame_{frame_idx:06d}.png')
-            img.save(frame_filename)
+            frame_array = frame_buffer.reshape((self.height, self.width, 3))
             
-            # Store frame metadata
-            frame_meta = {
-                'frame_idx': frame_idx,
-                'video_bytes': video_data_size,
-                'audio_bytes': len(audio_data),
-                'compression': compression_meta
-            }
-            frames_metadata.append(frame_meta)
+            if raw_frames is not None:
+                raw_frames.write(frame_array)
+            else:
+                # Create image
+                img = Image.fromarray(frame_array, mode='RGB')
+                frame_filename = os.path.join(output_dir, f'frame_{frame_idx:06d}.png')
+                if len(pending_saves) >= 2 * save_workers:
+                    pending_saves.popleft().result()
+                pending_saves.append(save_executor.submit(img.save, frame_filename, compress_level=1))
             
             if (frame_idx + 1) % 10 == 0 or frame_idx == num_frames - 1:
                 print(f"  Generated frame {frame_idx + 1}/{num_frames} (compression ratio: {compression_meta['compression_ratio']:.2f})")
         
-        # Combine all audio data
-        combined_audio = np.concatenate(all_audio_data)
+        # Wait for the remaining frames to be written
+        while pending_saves:
+            pending_saves.popleft().result()
+        save_executor.shutdown()
+        if raw_frames is not None:
+            raw_frames.close()
+        
+        # Release the last frame's views so the mapping can be closed
+        frame_total_data = video_data = audio_data = None
+        if file_size > 0:
+            data.close()
+        
+        # Frames are independent, so compress and save them across processes.
+        # Workers read their own slice of the input, so tasks stay tiny.
+        if workers > 1 and num_frames > 0:
+            tasks = ((frame_idx, input_file, output_dir, frame_format) for frame_idx in range(num_frames))
+            with multiprocessing.Pool(workers, initializer=_init_frame_worker, initargs=(self,)) as pool:
+                for done, (frame_idx, compression_meta) in enumerate(
+                        pool.imap_unordered(_process_frame, tasks, chunksize=4), start=1):
+                    self._store_compression_meta(frames_metadata, frame_idx, compression_meta)
+                    if done % 10 == 0 or done == num_frames:
+                        print(f"  Generated frame {done}/{num_frames}")
         
         # Save as raw PCM audio
         audio_filename = os.path.join(output_dir, 'audio.raw')
-        combined_audio.tofile(audio_filename)
+        audio_buf.tofile(audio_filename)
         
         # Save metadata
         metadata = {
@@ -309,19 +675,62 @@ class AdvancedDataToVideoConverter:
             'audio_channels': self.audio_channels,
             'num_frames': num_frames,
             'fps': fps,
-            'frames': frames_metadata
+            'frame_format': frame_format,
+            'compression': self.compression
         }
         
         metadata_file = os.path.join(output_dir, 'metadata.json')
         with open(metadata_file, 'w') as f:
             json.dump(metadata, f, indent=2)
         
+        # Per-frame records go to a binary sidecar
+        frames_metadata.tofile(os.path.join(output_dir, 'metadata.bin'))
+        
         print(f"\n✓ Frames saved to: {output_dir}")
         print(f"✓ Audio saved to: {audio_filename}")
         print(f"✓ Metadata saved to: {metadata_file}")
         
         return num_frames
     
+    def _prefetch_png_frames(self, frames_dir, num_frames, prefetch=8):
+        """
+        Yield decoded PNG frames in order, decoding the next ones ahead of
+        time on a thread pool (PNG decoding releases the GIL).
+        
+        Args:
+            frames_dir: Directory containing frames
+            num_frames: Number of frames to load
+            prefetch: Maximum number of frames decoded ahead
+        """
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            pending = deque()
+            for frame_idx in range(num_frames):
+                frame_filename = os.path.join(frames_dir, f'frame_{frame_idx:06d}.png')
+                pending.append(executor.submit(_load_png_frame, frame_filename))
+                if len(pending) >= prefetch:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+    
+    def _decode_frame(self, compressed_bytes, frame_meta):
+        """Reverse the differential + RLE coding of one frame's video data."""
+        # Decode compressed data using matrix
+        # Since we used differential + RLE, we need to reverse both
+        decompressed = self._decode_rle(np.frombuffer(compressed_bytes, dtype=np.uint8))
+        
+        # Reverse differential encoding. The first diff is replaced by the
+        # base value and the uint8 running sum wraps mod 256, matching the
+        # encoder's np.diff on uint8 data.
+        if len(decompressed) > 0:
+            base_value = frame_meta['differential_base']
+            original_data = decompressed.astype(np.uint8)
+            original_data[0] = base_value
+            np.add.accumulate(original_data, out=original_data)
+        else:
+            original_data = decompressed
+        
+        return original_data
+    
     def frames_with_audio_to_file(self, frames_dir, output_file):
         """
         Reconstruct original file from frames and audio.
@@ -337,6 +746,10 @@ class AdvancedDataToVideoConverter:
         
         original_size = metadata['original_size']
         num_frames = metadata['num_frames']
+        frames_metadata = self.load_frame_metadata(frames_dir)
+        compression = metadata.get('compression', 'rle')
+        if compression not in COMPRESSION_MODES:
+            raise ValueError(f"Unsupported compression {compression!r} in {metadata_file}")
         
         print(f"Reconstructing file...")
         print(f"Original size: {original_size:,} bytes")
@@ -346,65 +759,62 @@ class AdvancedDataToVideoConverter:
         audio_filename = os.path.join(frames_dir, 'audio.raw')
         audio_data = np.fromfile(audio_filename, dtype=np.int16)
         
-        # Collect all data
-        all_data = bytearray()
+        # One row of PCM bytes per frame (an empty input has no frames, so
+        # there are no rows to reshape into and nothing to map below)
+        audio_rows = audio_data.view(np.uint8)
+        if num_frames > 0:
+            audio_rows = audio_rows.reshape(num_frames, -1)
+        
+        # Raw frames are memory-mapped, one row of rgb24 bytes per frame
+        # and PNG frames are decoded ahead on a thread pool
+        raw_frames = None
+        if metadata.get('frame_format', 'png') == 'raw' and num_frames > 0:
+            raw_frames = np.memmap(os.path.join(frames_dir, 'frames.bin'), dtype=np.uint8, mode='r',
+                                   shape=(num_frames, metadata['width'] * metadata['height'] * 3))
+        else:
+            png_frames = self._prefetch_png_frames(frames_dir, num_frames)
         
-        audio_offset = 0
+        # Collect all data into a preallocated buffer with a write cursor
+        all_data = np.empty(original_size, dtype=np.uint8)
+        data_pos = 0
         
         for frame_idx in range(num_frames):
-            frame_meta = metadata['frames'][frame_idx]
+            frame_meta = frames_metadata[frame_idx]
             
-            # Load video frame
-            frame_filename = os.path.join(frames_dir, f'frame_{frame_idx:06d}.png')
-            img = Image.open(frame_filename)
-            frame_array = np.array(img)
-            
-            # Extract compressed data from frame
-            compressed_bytes = frame_array.tobytes()[:frame_meta['video_bytes']]
-            
-            # Extract matrix from audio
-            matrix_size = frame_meta['compression']['matrix_size']
-            samples_for_matrix = matrix_size * matrix_size
-            matrix_audio_samples = audio_data[audio_offset:audio_offset + samples_for_matrix]
-            
-            # Reconstruct matrix
-            encoding_matrix = self.audio_to_matrix(matrix_audio_samples.tobytes(), matrix_size)
+            # Load video frame and extract compressed data from it
+            if raw_frames is not None:
+                compressed_bytes = raw_frames[frame_idx, :frame_meta['video_bytes']]
+            else:
+                compressed_bytes = next(png_frames)[:frame_meta['video_bytes']]
             
-            # Decode compressed data using matrix
-            # Since we used differential + RLE, we need to reverse both
-            decompressed = self._decode_rle(np.frombuffer(compressed_bytes, dtype=np.uint8))
+            # Each audio row starts with the matrix block (8 bits per element)
+            matrix_size = int(frame_meta['matrix_size'])
+            matrix_bytes = matrix_size * matrix_size
             
-            # Reverse differential encoding
-            if len(decompressed) > 0:
-                base_value = frame_meta['compression']['differential_base']
-                original_data = np.cumsum(decompressed, dtype=np.int32)
-                original_data[0] = base_value
-                original_data = np.clip(original_data, 0, 255).astype(np.uint8)
+            if compression == 'none':
+                # Passthrough frames hold the payload as-is
+                original_data = np.frombuffer(compressed_bytes, dtype=np.uint8)
             else:
-                original_data = decompressed
+                original_data = self._decode_frame(compressed_bytes, frame_meta)
             
             # Take only the original length
-            original_length = frame_meta['compression']['original_length']
-            video_data = original_data[:original_length].tobytes()
-            
-            all_data.extend(video_data)
+            original_length = frame_meta['original_length']
+            video_data = original_data[:original_length]
             
-            # Extract audio data (after matrix samples)
-            audio_start = audio_offset + samples_for_matrix
-            audio_end = audio_start + (frame_meta['audio_bytes'] // 2)  # 16-bit samples
-            frame_audio_samples = audio_data[audio_start:audio_end]
-            frame_audio_bytes = frame_audio_samples.tobytes()[:frame_meta['audio_bytes']]
+            all_data[data_pos:data_pos + len(video_data)] = video_data
+            data_pos += len(video_data)
             
-            all_data.extend(frame_audio_bytes)
+            # Extract audio data (after matrix samples), addressed in bytes
+            frame_audio_bytes = audio_rows[frame_idx, matrix_bytes:matrix_bytes + frame_meta['audio_bytes']]
             
-            # Move audio offset
-            audio_offset += self.samples_per_frame
+            all_data[data_pos:data_pos + len(frame_audio_bytes)] = frame_audio_bytes
+            data_pos += len(frame_audio_bytes)
             
             if (frame_idx + 1) % 10 == 0 or frame_idx == num_frames - 1:
                 print(f"  Processed frame {frame_idx + 1}/{num_frames}")
         
-        # Trim to original size
-        all_data = all_data[:original_size]
+        # Trim to the bytes actually recovered
+        all_data = all_data[:data_pos]
         
         # Write to file
         with open(output_file, 'wb') as f:
@@ -456,16 +866,28 @@ class AdvancedDataToVideoConverter:
             print(f"\nConverting audio to WAV...")
             subprocess.run(cmd_audio, capture_output=True)
             
-            # Create video with audio
-            input_pattern = os.path.join(frames_dir, 'frame_%06d.png')
+            # Create video with audio. Raw frames are fed to ffmpeg as rgb24
+            # rawvideo so no PNG has to be decoded.
+            if metadata.get('frame_format', 'png') == 'raw':
+                video_input = [
+                    '-f', 'rawvideo',
+                    '-pix_fmt', 'rgb24',
+                    '-s', f"{metadata['width']}x{metadata['height']}",
+                    '-framerate', str(fps),
+                    '-i', os.path.join(frames_dir, 'frames.bin'),
+                ]
+            else:
+                video_input = [
+                    '-framerate', str(fps),
+                    '-i', os.path.join(frames_dir, 'frame_%06d.png'),
+                ]
             cmd_video = [
                 'ffmpeg', '-y',
-                '-framerate', str(fps),
-                '-i', input_pattern,
+                *video_input,
                 '-i', audio_wav,
-                '-c:v', 'libx264',
-                '-preset', 'ultrafast',
-                '-crf', '0',  # Lossless
+                # Frame bytes must come back bit-exact, so this is lossless
+                # RGB (libx264rgb, rgb24), not libx264's YUV conversion
+                *VIDEO_CODEC_ARGS,
                 '-c:a', 'pcm_s16le',  # Lossless audio
                 '-shortest',
                 output_video
@@ -502,6 +924,13 @@ def main():
                        help='Audio sample rate (default: 48000)')
     parser.add_argument('--fps', type=int, default=30, 
                        help='Frames per second (default: 30)')
+    parser.add_argument('--frame-format', choices=['png', 'raw'], default='png',
+                       help='png: one PNG per frame, raw: single rgb24 frames.bin (default: png)')
+    parser.add_argument('--compression', choices=COMPRESSION_MODES, default='none',
+                       help='none: store bytes as-is and let the video codec compress, '
+                            'rle: differential + RLE (default: none)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Processes used to compress and save frames (default: 1)')
     parser.add_argument('--video', help='Create video file with audio (requires ffmpeg)')
     
     args = parser.parse_args()
@@ -509,7 +938,8 @@ def main():
     converter = AdvancedDataToVideoConverter(
         width=args.width, 
         height=args.height,
-        sample_rate=args.sample_rate
+        sample_rate=args.sample_rate,
+        compression=args.compression
     )
     
     if args.mode == 'encode':
@@ -517,7 +947,8 @@ def main():
             print(f"Error: Input file not found: {args.input}")
             return
         
-        num_frames = converter.file_to_frames_with_audio(args.input, args.output, fps=args.fps)
+        num_frames = converter.file_to_frames_with_audio(args.input, args.output, fps=args.fps,
+                                                         frame_format=args.frame_format, workers=args.workers)
         
         if args.video:
             converter.create_video_with_audio(args.output, args.video, fps=args.fps)
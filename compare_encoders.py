@@ -75,7 +75,7 @@ def compare_encoders(filename, data):
     print(f"\n{'ADVANCED ENCODER':^80}")
     print("─" * 80)
     
-    advanced = AdvancedConverter(width=1920, height=1080)
+    advanced = AdvancedConverter(width=1920, height=1080, compression='rle')
     
     advanced_frames = len(data) / advanced.bytes_per_frame_total
     advanced_dir = f'advanced_{filename}_frames'
@@ -88,12 +88,9 @@ def compare_encoders(filename, data):
     advanced_frame_count = len([f for f in os.listdir(advanced_dir) if f.startswith('frame_')])
     
     # Check compression from metadata
-    import json
-    with open(os.path.join(advanced_dir, 'metadata.json'), 'r') as f:
-        metadata = json.load(f)
-    
-    avg_compression = np.mean([frame['compression']['compression_ratio'] 
-                               for frame in metadata['frames']])
+    frames_metadata = advanced.load_frame_metadata(advanced_dir)
+    avg_compression = np.mean(frames_metadata['compressed_length'] /
+                              np.maximum(frames_metadata['original_length'], 1))
     
     print(f"Frames created: {advanced_frame_count}")
     print(f"Processing time: {advanced_time:.3f} seconds")
@@ -6,11 +6,248 @@ Each pixel stores 3 bytes of data (R, G, B channels).
 """
 
 import os
-import math
-import numpy as np
+import mmap
+import time
 from PIL import Image
 import argparse
+import json
+import struct
+import subprocess
+import tempfile
+import zlib
+from functools import lru_cache
 from pathlib import Path
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    from tqdm import tqdm
+except ImportError:  # tqdm is optional, plain progress lines are printed instead
+    tqdm = None
+
+
+# Fixed 64-byte header stored in header.bin: magic, version, width, height,
+# num_frames, original_size, frame format and (truncated) original filename.
+# Every frame's offset in the reconstructed file follows from it.
+HEADER_FORMAT = '<4sIIIQQ4s28s'
+HEADER_MAGIC = b'D2V1'
+HEADER_VERSION = 1
+
+
+# ffmpeg encoder settings for frame videos. The payload is arbitrary bytes,
+# so the RGB planes must survive bit-exact: libx264rgb at crf 0 encodes
+# rgb24 losslessly. libx264 with yuv420p is NOT lossless for this data: the
+# RGB -> YUV conversion and 4:2:0 chroma subsampling alter the bytes even
+# at crf 0, and the frames can then no longer be decoded.
+VIDEO_CODEC_ARGS = [
+    '-c:v', 'libx264rgb',
+    '-pix_fmt', 'rgb24',
+    '-crf', '0',  # Lossless
+    '-preset', 'ultrafast',
+]
+
+
+def _progress(iterable, total, desc, interval=0.5):
+    """
+    Report progress over iterable, refreshing at most every interval seconds.
+    
+    Uses a tqdm bar when tqdm is installed, else prints a progress line.
+    """
+    if tqdm is not None:
+        yield from tqdm(iterable, total=total, desc=desc, unit='frame', mininterval=interval)
+        return
+    
+    last_report = time.monotonic()
+    for done, item in enumerate(iterable, start=1):
+        yield item
+        now = time.monotonic()
+        if now - last_report >= interval or done == total:
+            print(f"  {desc}: {done}/{total}")
+            last_report = now
+
+
+# PNG frames are written directly rather than through PIL. Frames of
+# incompressible data (archives, media, encrypted files) go into stored
+# (uncompressed) deflate blocks, so only the CRC / Adler-32 checksums cost
+# anything; frames that do compress (text, sparse data, the zero-padded last
+# frame) are deflated at level 1, see _png_compress_level.
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def _png_chunk(chunk_type, data):
+    """Serialize one PNG chunk: length, type, data and CRC."""
+    return (struct.pack('>I', len(data)) + chunk_type + data
+            + struct.pack('>I', zlib.crc32(data, zlib.crc32(chunk_type))))
+
+
+@lru_cache(maxsize=None)
+def _png_header(width, height):
+    """PNG signature and IHDR chunk for an 8-bit RGB image, same for every frame."""
+    ihdr = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return PNG_SIGNATURE + _png_chunk(b'IHDR', ihdr)
+
+
+PNG_IEND = _png_chunk(b'IEND', b'')
+
+
+def _png_compress_level(scanlines, samples=16, sample_size=4096):
+    """
+    Pick the deflate level for one frame's scanlines from a sample of them.
+    
+    Deflates about samples * sample_size bytes taken evenly across the frame
+    and returns 0 (stored blocks) if that saves less than 10%, else 1.
+    """
+    view = memoryview(scanlines)
+    step = max(len(view) // samples, sample_size)
+    sample = b''.join(view[i:i + sample_size] for i in range(0, len(view), step))
+    return 1 if len(zlib.compress(sample, 1)) < 0.9 * len(sample) else 0
+
+
+# Scanline buffer reused by _encode_frame, one per process. Every row starts
+# with its filter type byte, which stays 0 (no filter).
+_png_scanlines = bytearray()
+
+
+def _write_fd(fd, buffers):
+    """
+    Write buffers back to back to a raw file descriptor, without joining them.
+    
+    Uses a single os.writev call where available (POSIX); whatever a short
+    write leaves over, or every buffer on other platforms, is written with
+    os.write.
+    """
+    written = os.writev(fd, buffers) if hasattr(os, 'writev') else 0
+    
+    for buf in buffers:
+        view = memoryview(buf)
+        if written >= len(view):
+            written -= len(view)
+            continue
+        view = view[written:]
+        written = 0
+        while view:
+            view = view[os.write(fd, view):]
+
+
+def _write_file(filename, buffers):
+    """
+    Create (or truncate) filename and write buffers to it with _write_fd,
+    without a Python file object or buffering in between.
+    """
+    fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        _write_fd(fd, buffers)
+    finally:
+        os.close(fd)
+
+
+def _encode_frame(args):
+    """
+    Save one frame image. Module level so ProcessPoolExecutor workers can run it.
+    
+    Args:
+        args: (frame_idx, frame_buffers, width, height, frame_filename, frame_format),
+            frame_buffers being the list of buffers that make up the frame
+            (see DataToVideoConverter._frame_buffers)
+    
+    Returns:
+        frame_idx of the saved frame
+    """
+    global _png_scanlines
+    frame_idx, frame_buffers, width, height, frame_filename, frame_format = args
+    
+    if frame_format == 'ppm':
+        # Binary PPM is a short header followed by the raw RGB bytes, written
+        # together in one syscall straight from the frame buffers (no copy)
+        _write_file(frame_filename, [b'P6\n%d %d\n255\n' % (width, height), *frame_buffers])
+    else:
+        # The scanline copy below needs the frame in one buffer; only the
+        # padded last frame comes in pieces, so copy its data into a zeroed frame
+        frame_data = frame_buffers[0]
+        if len(frame_buffers) > 1:
+            frame_data = bytearray(width * height * 3)
+            frame_data[:len(frame_buffers[0])] = frame_buffers[0]
+        
+        # Each 3 consecutive bytes become one RGB pixel; copy the rows in
+        # behind their filter bytes
+        row_size = width * 3
+        if len(_png_scanlines) != height * (row_size + 1):
+            _png_scanlines = bytearray(height * (row_size + 1))
+        rows = memoryview(frame_data)
+        for y in range(height):
+            start = y * (row_size + 1) + 1
+            _png_scanlines[start:start + row_size] = rows[y * row_size:(y + 1) * row_size]
+        
+        # Incompressible frames are stored (level 0), deflating them would
+        # cost a lot of CPU for no gain; anything else is deflated
+        idat = zlib.compress(_png_scanlines, _png_compress_level(_png_scanlines))
+        idat_crc = zlib.crc32(idat, zlib.crc32(b'IDAT'))
+        
+        _write_file(frame_filename, [_png_header(width, height) + struct.pack('>I', len(idat)) + b'IDAT',
+                                     idat,
+                                     struct.pack('>I', idat_crc) + PNG_IEND])
+    
+    return frame_idx
+
+
+def _encode_frame_batch(args):
+    """
+    Read a run of consecutive frames from the input file and save them.
+    
+    Workers read their own slice of the input, so a task is only a few
+    numbers and the parent never copies or pickles frame data.
+    
+    Args:
+        args: (first_frame_idx, num_frames, input_file, width, height, output_dir, frame_format)
+    
+    Returns:
+        Indices of the saved frames
+    """
+    first_frame_idx, num_frames, input_file, width, height, output_dir, frame_format = args
+    frame_size = width * height * 3
+    
+    # The buffer starts zeroed, so a short read at the end of the file
+    # leaves the last frame padded with zeros
+    batch = bytearray(num_frames * frame_size)
+    with open(input_file, 'rb') as f:
+        f.seek(first_frame_idx * frame_size)
+        f.readinto(batch)
+    
+    batch = memoryview(batch)
+    frame_idxs = range(first_frame_idx, first_frame_idx + num_frames)
+    for i, frame_idx in enumerate(frame_idxs):
+        frame_data = batch[i * frame_size:(i + 1) * frame_size]
+        frame_filename = os.path.join(output_dir, f'frame_{frame_idx:06d}.{frame_format}')
+        _encode_frame((frame_idx, [frame_data], width, height, frame_filename, frame_format))
+    
+    return frame_idxs
+
+
+def _check_ffmpeg():
+    """Return True if ffmpeg can be run, printing why not otherwise."""
+    try:
+        result = subprocess.run(['ffmpeg', '-version'], 
+                               capture_output=True, 
+                               text=True)
+    except Exception as e:
+        print(f"Error: {e}")
+        return False
+    
+    if result.returncode != 0:
+        print("ffmpeg not found. Install it to create video files.")
+        return False
+    return True
+
+
+def _load_frame_into(output, frame_filename, offset):
+    """Decode one frame image into output at offset, returns the bytes written."""
+    # Decode fully inside the with block so the file is closed right away,
+    # then read the pixels out through the raw RGB encoder
+    with Image.open(frame_filename) as img:
+        img.load()
+        frame_bytes = img.tobytes('raw', 'RGB')
+    output[offset:offset + len(frame_bytes)] = frame_bytes
+    return len(frame_bytes)
 
 
 class DataToVideoConverter:
@@ -26,30 +263,30 @@ class DataToVideoConverter:
         self.height = height
         self.bytes_per_frame = width * height * 3  # 3 bytes per pixel (RGB)
         
-    def file_to_frames(self, input_file, output_dir):
+    def _map_input(self, input_file):
         """
-        Convert a file to video frames where each pixel represents 3 bytes of data.
+        Memory-map input_file and work out its frame layout.
         
-        Args:
-            input_file: Path to input file
-            output_dir: Directory to save frames
+        The file is mapped instead of read, so only the pages of the frame
+        being encoded need to be resident (mmap cannot map an empty file, so
+        that one comes back as b'').
+        
+        Returns:
+            Tuple of (data, metadata), metadata holding original_filename,
+            original_size, width, height and num_frames
         """
-        # Read file data
         with open(input_file, 'rb') as f:
-            data = f.read()
+            file_size = os.fstat(f.fileno()).st_size
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if file_size > 0 else b''
         
-        file_size = len(data)
         print(f"File size: {file_size:,} bytes")
         
-        # Calculate number of frames needed
-        num_frames = math.ceil(file_size / self.bytes_per_frame)
+        # Calculate number of frames needed (a partial last frame counts too)
+        num_full_frames, tail_size = divmod(file_size, self.bytes_per_frame)
+        num_frames = num_full_frames + (tail_size > 0)
         print(f"Bytes per frame: {self.bytes_per_frame:,}")
         print(f"Number of frames needed: {num_frames}")
         
-        # Create output directory
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Store metadata
         metadata = {
             'original_filename': os.path.basename(input_file),
             'original_size': file_size,
@@ -57,56 +294,146 @@ class DataToVideoConverter:
             'height': self.height,
             'num_frames': num_frames
         }
+        return data, metadata
+    
+    def file_to_frames(self, input_file, output_dir, frame_format='png', workers=None):
+        """
+        Convert a file to video frames where each pixel represents 3 bytes of data.
+        
+        Args:
+            input_file: Path to input file
+            output_dir: Directory to save frames
+            frame_format: 'png' or 'ppm', both written directly without PIL
+                (PNG frames are only deflated when their data compresses)
+            workers: Number of processes saving frames (default: os.cpu_count())
+        """
+        data, metadata = self._map_input(input_file)
+        file_size = metadata['original_size']
+        num_frames = metadata['num_frames']
         
-        # Save metadata
+        # Create output directory
+        os.makedirs(output_dir, exist_ok=True)
+        
+        # Save metadata, readable text plus the binary header used for decoding
+        metadata['frame_format'] = frame_format
         metadata_file = os.path.join(output_dir, 'metadata.txt')
         with open(metadata_file, 'w') as f:
             for key, value in metadata.items():
                 f.write(f"{key}: {value}\n")
         
+        header = struct.pack(HEADER_FORMAT, HEADER_MAGIC, HEADER_VERSION,
+                             self.width, self.height, num_frames, file_size,
+                             frame_format.encode(), metadata['original_filename'].encode()[:28])
+        with open(os.path.join(output_dir, 'header.bin'), 'wb') as f:
+            f.write(header)
+        
         print(f"\nGenerating frames...")
         
+        # No point starting more processes than there are frames
+        workers = max(1, min(workers or os.cpu_count() or 1, num_frames))
+        
         # Generate frames
-        for frame_idx in range(num_frames):
-            # Calculate data slice for this frame
-            start_idx = frame_idx * self.bytes_per_frame
-            end_idx = min(start_idx + self.bytes_per_frame, file_size)
-            frame_data = data[start_idx:end_idx]
-            
-            # Pad last frame if necessary
-            if len(frame_data) < self.bytes_per_frame:
-                # Pad with zeros
-                frame_data = frame_data + b'\x00' * (self.bytes_per_frame - len(frame_data))
-            
-            # Convert bytes to RGB array
-            # Each 3 consecutive bytes become one RGB pixel
-            pixels = np.frombuffer(frame_data, dtype=np.uint8)
-            
-            # Reshape to (height, width, 3) for RGB image
-            frame_array = pixels.reshape((self.height, self.width, 3))
-            
-            # Create image
-            img = Image.fromarray(frame_array, mode='RGB')
-            
-            # Save frame
-            frame_filename = os.path.join(output_dir, f'frame_{frame_idx:06d}.png')
-            img.save(frame_filename)
-            
-            if (frame_idx + 1) % 10 == 0 or frame_idx == num_frames - 1:
-                print(f"  Generated frame {frame_idx + 1}/{num_frames}")
+        view = memoryview(data)
+        if workers == 1:
+            jobs = self._frame_jobs(view, output_dir, frame_format)
+            saved_frames = (_encode_frame(job) for job in jobs)
+        else:
+            saved_frames = self._encode_frames_parallel(input_file, output_dir, frame_format,
+                                                        workers, num_frames)
+        
+        for _ in _progress(saved_frames, num_frames, 'Generating frames'):
+            pass
+        
+        # All frame slices are gone by now, so the mapping can be closed
+        view.release()
+        if file_size > 0:
+            data.close()
         
         print(f"\n✓ Frames saved to: {output_dir}")
         return num_frames
     
-    def frames_to_file(self, frames_dir, output_file):
+    def _frame_buffers(self, data):
         """
-        Reconstruct original file from video frames.
+        Yield, for every frame of data, the list of buffers making up the frame.
+        
+        Full frames are a single zero-copy slice of data (a memoryview); the
+        short last frame is its slice followed by a buffer of zero padding,
+        for writing with _write_fd or passing to _encode_frame.
+        """
+        bytes_per_frame = self.bytes_per_frame
+        num_full_frames, tail_size = divmod(len(data), bytes_per_frame)
+        
+        # Full frames need no bounds or padding checks
+        for frame_idx in range(num_full_frames):
+            start_idx = frame_idx * bytes_per_frame
+            yield [data[start_idx:start_idx + bytes_per_frame]]
+        
+        # Pad last frame if necessary
+        if tail_size:
+            yield [data[num_full_frames * bytes_per_frame:], bytes(bytes_per_frame - tail_size)]
+    
+    def _frame_jobs(self, data, output_dir, frame_format):
+        """Yield one _encode_frame argument tuple per frame of data."""
+        for frame_idx, frame_buffers in enumerate(self._frame_buffers(data)):
+            frame_filename = os.path.join(output_dir, f'frame_{frame_idx:06d}.{frame_format}')
+            yield (frame_idx, frame_buffers, self.width, self.height, frame_filename, frame_format)
+    
+    def _encode_frames_parallel(self, input_file, output_dir, frame_format, workers, num_frames):
+        """
+        Save frames in a process pool, yielding frame indices in order as frames are saved.
+        
+        Each task covers a run of consecutive frames that the worker reads from
+        input_file itself (see _encode_frame_batch). Only 2 * workers tasks are
+        in flight at a time.
+        """
+        # Tasks cover about 4 MB of frames, but still at least 4 tasks per
+        # worker so small files are spread over all of them
+        frames_per_task = max(1, min((4 << 20) // self.bytes_per_frame,
+                                     num_frames // (4 * workers)))
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for first_frame_idx in range(0, num_frames, frames_per_task):
+                task = (first_frame_idx, min(frames_per_task, num_frames - first_frame_idx), input_file,
+                        self.width, self.height, output_dir, frame_format)
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+                pending.append(executor.submit(_encode_frame_batch, task))
+            while pending:
+                yield from pending.popleft().result()
+    
+    def load_metadata(self, frames_dir):
+        """
+        Load the frame layout written by file_to_frames.
+        
+        Reads the binary header.bin, falling back to parsing metadata.txt
+        for frames written before the header existed.
         
         Args:
             frames_dir: Directory containing frames
-            output_file: Path to save reconstructed file
+            
+        Returns:
+            Dict with original_filename, original_size, width, height,
+            num_frames and frame_format
         """
-        # Read metadata
+        header_file = os.path.join(frames_dir, 'header.bin')
+        if os.path.exists(header_file):
+            with open(header_file, 'rb') as f:
+                (magic, version, width, height, num_frames, original_size,
+                 frame_format, filename) = struct.unpack(HEADER_FORMAT, f.read(struct.calcsize(HEADER_FORMAT)))
+            
+            if magic != HEADER_MAGIC or version != HEADER_VERSION:
+                raise ValueError(f"Unsupported frame header in {header_file}")
+            
+            return {
+                'original_filename': filename.rstrip(b'\x00').decode(errors='ignore'),
+                'original_size': original_size,
+                'width': width,
+                'height': height,
+                'num_frames': num_frames,
+                'frame_format': frame_format.rstrip(b'\x00').decode()
+            }
+        
         metadata_file = os.path.join(frames_dir, 'metadata.txt')
         metadata = {}
         
@@ -115,71 +442,168 @@ class DataToVideoConverter:
                 key, value = line.strip().split(': ', 1)
                 metadata[key] = value
         
-        original_size = int(metadata['original_size'])
-        num_frames = int(metadata['num_frames'])
+        for key in ('original_size', 'width', 'height', 'num_frames'):
+            metadata[key] = int(metadata[key])
+        metadata.setdefault('frame_format', 'png')
+        return metadata
+    
+    def frames_to_file(self, frames_dir, output_file):
+        """
+        Reconstruct original file from video frames.
+        
+        Args:
+            frames_dir: Directory containing frames
+            output_file: Path to save reconstructed file
+        """
+        # Read metadata
+        metadata = self.load_metadata(frames_dir)
+        
+        original_size = metadata['original_size']
+        num_frames = metadata['num_frames']
+        frame_format = metadata['frame_format']
         
         print(f"Reconstructing file...")
         print(f"Original size: {original_size:,} bytes")
         print(f"Number of frames: {num_frames}")
         
-        # Collect all data
-        all_data = bytearray()
-        
-        for frame_idx in range(num_frames):
-            frame_filename = os.path.join(frames_dir, f'frame_{frame_idx:06d}.png')
-            
-            # Load image
-            img = Image.open(frame_filename)
-            frame_array = np.array(img)
+        # Frames are written straight into their slot of the preallocated,
+        # memory-mapped output file instead of being collected in memory
+        frame_size = metadata['width'] * metadata['height'] * 3
+        with open(output_file, 'w+b') as f:
+            f.truncate(num_frames * frame_size)
             
-            # Flatten to bytes
-            frame_bytes = frame_array.tobytes()
-            all_data.extend(frame_bytes)
+            if num_frames > 0:
+                output = mmap.mmap(f.fileno(), 0)
+                
+                # Every frame's offset is known, so frames are decoded in parallel
+                # on a thread pool (PNG decoding releases the GIL), each straight
+                # into its own slot
+                frame_filenames = [os.path.join(frames_dir, f'frame_{frame_idx:06d}.{frame_format}')
+                                   for frame_idx in range(num_frames)]
+                offsets = range(0, num_frames * frame_size, frame_size)
+                with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+                    written = executor.map(_load_frame_into, [output] * num_frames, frame_filenames, offsets)
+                    for frame_idx, frame_bytes in enumerate(_progress(written, num_frames, 'Processing frames')):
+                        if frame_bytes != frame_size:
+                            raise ValueError(f"{frame_filenames[frame_idx]} is not a {metadata['width']}x{metadata['height']} RGB frame")
+                
+                output.close()
             
-            if (frame_idx + 1) % 10 == 0 or frame_idx == num_frames - 1:
-                print(f"  Processed frame {frame_idx + 1}/{num_frames}")
+            # Trim to original size (remove padding)
+            f.truncate(original_size)
+        
+        print(f"\n✓ File reconstructed: {output_file}")
+        print(f"  Size: {original_size:,} bytes")
+    
+    def file_to_video(self, input_file, output_video, fps=30):
+        """
+        Convert a file straight to a video by piping raw RGB frames into ffmpeg,
+        without writing or decoding any intermediate frame images. The video is
+        encoded losslessly in RGB (see VIDEO_CODEC_ARGS).
         
-        # Trim to original size (remove padding)
-        all_data = all_data[:original_size]
+        Metadata is written next to the video as <output_video>.json.
         
-        # Write to file
-        with open(output_file, 'wb') as f:
-            f.write(all_data)
+        Args:
+            input_file: Path to input file
+            output_video: Output video filename
+            fps: Frames per second
+        """
+        if not _check_ffmpeg():
+            return False
         
-        print(f"\n✓ File reconstructed: {output_file}")
-        print(f"  Size: {len(all_data):,} bytes")
+        data, metadata = self._map_input(input_file)
+        file_size = metadata['original_size']
+        num_frames = metadata['num_frames']
+        
+        # Save metadata sidecar
+        metadata['fps'] = fps
+        with open(f'{output_video}.json', 'w') as f:
+            json.dump(metadata, f, indent=2)
+        
+        cmd = [
+            'ffmpeg',
+            '-y',  # Overwrite output file
+            '-loglevel', 'error',
+            '-f', 'rawvideo',
+            '-pixel_format', 'rgb24',
+            '-video_size', f'{self.width}x{self.height}',
+            '-framerate', str(fps),
+            '-i', '-',  # Frames arrive on stdin
+            *VIDEO_CODEC_ARGS,
+            output_video
+        ]
+        
+        print(f"\nStreaming frames to ffmpeg...")
+        # ffmpeg's stderr goes to a temporary file read after it exits: a pipe
+        # nobody reads while frames are written would fill up and hang both
+        stderr_file = tempfile.TemporaryFile()
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, bufsize=0,
+                                stdout=subprocess.DEVNULL,
+                                stderr=stderr_file)
+        
+        # Frames go from the mapping straight into the pipe with writev, no
+        # Python-side buffering or padded copy of the last frame
+        view = memoryview(data)
+        frames = self._frame_buffers(view)
+        progress = _progress(frames, num_frames, 'Streaming frames')
+        buffers = None
+        try:
+            for buffers in progress:
+                try:
+                    _write_fd(proc.stdin.fileno(), buffers)
+                except BrokenPipeError:
+                    # ffmpeg exited early, its stderr explains why
+                    break
+        finally:
+            # ffmpeg only finishes once its input is closed
+            try:
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass
+        
+        # Drop the last frame slices so the mapping can be closed
+        progress.close()
+        frames.close()
+        buffers = None
+        view.release()
+        if file_size > 0:
+            data.close()
+        
+        proc.wait()
+        with stderr_file:
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode(errors='replace')
+        
+        if proc.returncode == 0:
+            print(f"\n✓ Video created: {output_video}")
+            return True
+        else:
+            print(f"Error creating video: {stderr}")
+            return False
     
-    def create_video(self, frames_dir, output_video, fps=30):
+    def create_video(self, frames_dir, output_video, fps=30, frame_format='png'):
         """
-        Create video from frames using ffmpeg (if available).
+        Create video from frames using ffmpeg (if available). The video is
+        encoded losslessly in RGB (see VIDEO_CODEC_ARGS).
         
         Args:
             frames_dir: Directory containing frames
             output_video: Output video filename
             fps: Frames per second
+            frame_format: Extension of the frame files ('png' or 'ppm')
         """
+        if not _check_ffmpeg():
+            return False
+        
         try:
-            import subprocess
-            
-            # Check if ffmpeg is available
-            result = subprocess.run(['ffmpeg', '-version'], 
-                                   capture_output=True, 
-                                   text=True)
-            
-            if result.returncode != 0:
-                print("ffmpeg not found. Install it to create video files.")
-                return False
-            
             # Create video from frames
-            input_pattern = os.path.join(frames_dir, 'frame_%06d.png')
+            input_pattern = os.path.join(frames_dir, f'frame_%06d.{frame_format}')
             cmd = [
                 'ffmpeg',
                 '-y',  # Overwrite output file
                 '-framerate', str(fps),
                 '-i', input_pattern,
-                '-c:v', 'libx264',
-                '-pix_fmt', 'yuv420p',
-                '-crf', '0',  # Lossless
+                *VIDEO_CODEC_ARGS,
                 output_video
             ]
             
@@ -205,14 +629,19 @@ def main():
     parser.add_argument('mode', choices=['encode', 'decode'], 
                        help='encode: file to frames, decode: frames to file')
     parser.add_argument('input', help='Input file or frames directory')
-    parser.add_argument('output', help='Output directory (encode) or file (decode)')
+    parser.add_argument('output', help='Output directory (encode, unused with --video) or file (decode)')
     parser.add_argument('--width', type=int, default=1920, 
                        help='Frame width (default: 1920)')
     parser.add_argument('--height', type=int, default=1080, 
                        help='Frame height (default: 1080)')
     parser.add_argument('--fps', type=int, default=30, 
                        help='Frames per second for video (default: 30)')
-    parser.add_argument('--video', help='Create video file (requires ffmpeg)')
+    parser.add_argument('--format', dest='frame_format', choices=['png', 'ppm'], default='png',
+                       help='Frame file format (default: png)')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Processes used to save frames (default: all CPUs)')
+    parser.add_argument('--video', help='Stream the file straight into this video file instead of '
+                                        'writing frames (requires ffmpeg)')
     
     args = parser.parse_args()
     
@@ -224,11 +653,15 @@ def main():
             print(f"Error: Input file not found: {args.input}")
             return
         
-        num_frames = converter.file_to_frames(args.input, args.output)
-        
-        # Optionally create video
+        # A video is encoded straight from the file; writing frame images
+        # only for ffmpeg to decode them again would be wasted work
         if args.video:
-            converter.create_video(args.output, args.video, fps=args.fps)
+            converter.file_to_video(args.input, args.video, fps=args.fps)
+            return
+        
+        num_frames = converter.file_to_frames(args.input, args.output,
+                                              frame_format=args.frame_format,
+                                              workers=args.workers)
             
     elif args.mode == 'decode':
         # Convert frames back to file